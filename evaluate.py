@@ -1,12 +1,13 @@
 import os
 import sys
 import csv
+import heapq
 import pickle
 from pathlib import Path
 from collections import defaultdict
 
 from models.damerau_levenshtein import (
-    similarity_score, normalize,
+    similarity_score, damerau_levenshtein_bounded, normalize,
     compute_wer, compute_cer, find_best_ocr_token,
 )
 from models.drug_graph import build_drug_graph
@@ -19,12 +20,7 @@ if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
 
-def predict_label(ocr_texts, labels, graph=None, top_k=3,
-                  conflict_threshold=0.55):
-
-    if not ocr_texts:
-        return "UNKNOWN", 0.0, "no_ocr"
-
+def _rank_labels_full(ocr_texts, labels):
     label_scores = {}
     for label in labels:
         label_norm = normalize(label)
@@ -39,6 +35,77 @@ def predict_label(ocr_texts, labels, graph=None, top_k=3,
         label_scores[label] = best
 
     ranked = sorted(label_scores.items(), key=lambda x: x[1], reverse=True)
+    return ranked, label_scores
+
+
+def _rank_labels_topk(ocr_texts, labels, top_k, conflict_threshold, stats=None):
+    """Top-k ranking dengan batas jarak per pasangan token/label.
+
+    Skor terbaik saat ini, skor ke-k, dan conflict_threshold diubah menjadi
+    jarak DL maksimum yang masih relevan; pasangan yang melewatinya dipangkas.
+    Hasil akhir predict_label identik dengan mode "full".
+    """
+    tokens = [t for t in (normalize(tok) for tok in ocr_texts) if t]
+    heap_size = max(top_k, 1)
+    heap = []           # min-heap (score, -index, label), maks heap_size entri
+    best_score = None
+
+    for idx, label in enumerate(labels):
+        label_norm = normalize(label)
+
+        # Skor minimum agar label ini masih bisa mengubah hasil: menjadi
+        # kandidat top-k di atas threshold, atau menggeser label terbaik.
+        floor = 0.0
+        if best_score is not None:
+            floor = conflict_threshold if best_score >= conflict_threshold else best_score
+            if len(heap) == heap_size:
+                floor = max(floor, heap[0][0])
+
+        best = 0.0
+        for token_norm in tokens:
+            max_len = max(len(token_norm), len(label_norm))
+            if max_len == 0:
+                score = 1.0
+            else:
+                # score >= f  <=>  dist <= (1 - f) * max_len
+                max_dist = int((1.0 - max(floor, best)) * max_len + 1e-9)
+                dist = damerau_levenshtein_bounded(token_norm, label_norm, max_dist)
+                if stats is not None:
+                    stats['pairs'] += 1
+                if dist > max_dist:
+                    if stats is not None:
+                        stats['pruned'] += 1
+                    continue
+                score = 1.0 - dist / max_len
+            if score > best:
+                best = score
+
+        if best_score is not None and best < floor:
+            continue
+        entry = (best, -idx, label)
+        if len(heap) < heap_size:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+        if best_score is None or best > best_score:
+            best_score = best
+
+    ranked = [(lbl, sc) for sc, _, lbl in sorted(heap, reverse=True)]
+    return ranked, dict(ranked)
+
+
+def predict_label(ocr_texts, labels, graph=None, top_k=3,
+                  conflict_threshold=0.55, mode="full", stats=None):
+
+    if not ocr_texts:
+        return "UNKNOWN", 0.0, "no_ocr"
+
+    if mode == "topk":
+        ranked, label_scores = _rank_labels_topk(
+            ocr_texts, labels, top_k, conflict_threshold, stats
+        )
+    else:
+        ranked, label_scores = _rank_labels_full(ocr_texts, labels)
     if not ranked:
         return "UNKNOWN", 0.0, "no_ocr"
 
@@ -212,6 +279,7 @@ def main():
     results = []
     cache_hits = 0
     cache_misses = 0
+    match_stats = {'pairs': 0, 'pruned': 0}
 
     print("=" * 70)
     print(f"{'#':<5} {'Image':<40} {'True':<16} {'Pred':<16} {'Score':<7}")
@@ -239,7 +307,8 @@ def main():
         cache_hits += 1
 
         pred_label, score, resolution = predict_label(
-            ocr_texts, unique_labels, graph=drug_graph
+            ocr_texts, unique_labels, graph=drug_graph,
+            mode="topk", stats=match_stats
         )
         correct = (pred_label.lower() == true_label.lower())
         ocr_combined = ' | '.join(ocr_texts)
@@ -268,6 +337,10 @@ def main():
         writer.writerows(results)
     print(f"  Saved {len(results)} rows")
     print(f"  Pickle cache: {cache_hits} hits, {cache_misses} misses")
+    pairs = match_stats['pairs']
+    pruned = match_stats['pruned']
+    prune_rate = pruned / pairs * 100 if pairs else 0.0
+    print(f"  Top-k pruning: {pruned}/{pairs} pasangan token-label dipangkas ({prune_rate:.2f}%)")
 
     show_evaluation(results, OUTPUT_CSV)
 
@@ -31,6 +31,59 @@ def damerau_levenshtein(s1: str, s2: str) -> int:
     return dp[len1][len2]
 
 
+def damerau_levenshtein_bounded(s1: str, s2: str, max_dist: int) -> int:
+    """DL distance yang dibatasi max_dist (Ukkonen cutoff).
+
+    Hasilnya sama persis dengan damerau_levenshtein() bila jaraknya <= max_dist;
+    selain itu mengembalikan max_dist + 1 tanpa menghitung seluruh matriks.
+    """
+    s1 = s1.lower()
+    s2 = s2.lower()
+    len1, len2 = len(s1), len(s2)
+
+    if max_dist < 0 or abs(len1 - len2) > max_dist:
+        return max_dist + 1
+    if len1 == 0:
+        return len2
+    if len2 == 0:
+        return len1
+
+    # Sel di luar diagonal band |i - j| <= max_dist pasti > max_dist,
+    # jadi cukup disimpan sebagai "inf" (max_dist + 1).
+    inf = max_dist + 1
+    prev2 = None
+    prev = [j if j <= max_dist else inf for j in range(len2 + 1)]
+    prev_min = 0
+
+    for i in range(1, len1 + 1):
+        cur = [inf] * (len2 + 1)
+        if i <= max_dist:
+            cur[0] = i
+        row_min = cur[0]
+        for j in range(max(1, i - max_dist), min(len2, i + max_dist) + 1):
+            cost = 0 if s1[i - 1] == s2[j - 1] else 1
+            val = min(
+                prev[j] + 1,             # deletion
+                cur[j - 1] + 1,          # insertion
+                prev[j - 1] + cost       # substitution
+            )
+            # Transposition
+            if i > 1 and j > 1 and s1[i - 1] == s2[j - 2] and s1[i - 2] == s2[j - 1]:
+                val = min(val, prev2[j - 2] + cost)
+            if val > inf:
+                val = inf
+            cur[j] = val
+            if val < row_min:
+                row_min = val
+        # Transposisi bisa melompati satu baris, jadi berhenti hanya jika
+        # dua baris berturut-turut sudah melewati batas.
+        if row_min > max_dist and prev_min > max_dist:
+            return inf
+        prev2, prev, prev_min = prev, cur, row_min
+
+    return prev[len2]
+
+
 def similarity_score(s1: str, s2: str) -> float:
     """Normalisasi DL distance menjadi skor similarity [0, 1]."""
     dist = damerau_levenshtein(s1, s2)